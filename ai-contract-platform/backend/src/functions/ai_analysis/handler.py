@@ -1,49 +1,159 @@
-import json
+import asyncio
+import gzip
+import hashlib
 import os
-import boto3
-from typing import Dict, Any, List
+import re
+import time
+import orjson
+from typing import Dict, Any, List, Optional
+from common.clients import get_async_clients, get_read_table, get_table
 from common.logger import get_logger, log_with_context
 from common.exceptions import AIAnalysisError, DatabaseError
-from common.utils import generate_timestamp
+from common.utils import build_status_sort_key, generate_timestamp
 
 logger = get_logger(__name__)
 
 # Initialize AWS clients
-bedrock_client = boto3.client('bedrock-runtime')
-comprehend_client = boto3.client('comprehend')
-dynamodb = boto3.resource('dynamodb')
+# Bedrock and Comprehend are called through aioboto3
+async_clients = get_async_clients()
 
 # Environment variables
+DOCUMENTS_BUCKET = os.environ['DOCUMENTS_BUCKET']
 METADATA_TABLE = os.environ['METADATA_TABLE']
 BEDROCK_MODEL_ID = os.environ.get('BEDROCK_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
+# Bedrock already reports sentiment; Comprehend sentiment is an opt-in extra call
+COMPREHEND_SENTIMENT_ENABLED = os.environ.get('COMPREHEND_SENTIMENT_ENABLED', 'false').lower() == 'true'
+ANALYSIS_CACHE_TTL = int(os.environ.get('ANALYSIS_CACHE_TTL', 30 * 24 * 60 * 60))  # 30 days
 
-table = dynamodb.Table(METADATA_TABLE)
+table = get_table(METADATA_TABLE)
+
+# Cached analyses are read and written through DAX when configured, so a write
+# also refreshes DAX's item cache instead of leaving a cached miss behind
+cache_table = get_read_table(METADATA_TABLE)
+
+_PROMPT_TEMPLATE = """
+Analyze the following contract text and provide a comprehensive analysis. Focus on:
+1. Key terms and conditions
+2. Potential risks and liabilities
+3. Missing standard clauses
+4. Unusual or concerning provisions
+5. Compliance and regulatory considerations
+6. Overall sentiment of the contract language, with scores between 0 and 1 that sum to 1
+
+Provide your analysis in the following JSON format:
+{{
+    "key_terms": ["list of key terms and conditions"],
+    "risks": ["list of identified risks"],
+    "missing_clauses": ["list of standard clauses that appear to be missing"],
+    "unusual_provisions": ["list of unusual or concerning provisions"],
+    "compliance_issues": ["list of potential compliance issues"],
+    "recommendations": ["list of recommendations for improvement"],
+    "summary": "Brief summary of the contract analysis",
+    "sentiment": {{
+        "label": "one of POSITIVE, NEGATIVE, NEUTRAL or MIXED",
+        "scores": {{"Positive": 0.0, "Negative": 0.0, "Neutral": 0.0, "Mixed": 0.0}}
+    }}
+}}
+
+Contract text:
+{text}
+"""
+
+# Outermost JSON object in the model's response
+_JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
+# Risk points per identified item in each analysis field
+_RISK_WEIGHTS = (
+    ('risks', 10),
+    ('missing_clauses', 5),
+    ('unusual_provisions', 7),
+    ('compliance_issues', 15)
+)
+# Negative sentiment increases risk by up to this many points
+_NEGATIVE_SENTIMENT_WEIGHT = 20
+
+# Comprehend batch APIs accept up to 25 documents of at most 5000 bytes each
+COMPREHEND_CHUNK_BYTES = 4500
+COMPREHEND_MAX_BATCH = 25
+_SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+')
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    """Analyze contract text using Amazon Bedrock and Comprehend"""
+    """Analyze contract text using Amazon Bedrock"""
+    request_id = context.aws_request_id
+    contract_id = event.get('contract_id')
+    text_key = event.get('extracted_text_key')
+    created_at = event.get('created_at')
+    
+    try:
+        log_with_context(
+            logger, 'info',
+            "Starting Bedrock analysis",
+            contract_id=contract_id,
+            request_id=request_id
+        )
+        
+        analysis_results = async_clients.run(run_bedrock_analysis(text_key))
+        
+        # Bedrock reports sentiment alongside the analysis
+        sentiment_analysis = extract_sentiment_from_analysis(analysis_results)
+        
+        return {
+            'analysis_results': analysis_results,
+            'sentiment_analysis': sentiment_analysis
+        }
+        
+    except Exception as e:
+        logger.error(
+            f"Bedrock analysis failed: {str(e)}",
+            extra={'contract_id': contract_id, 'request_id': request_id}
+        )
+        mark_analysis_failed(contract_id, created_at)
+        raise e
+
+def comprehend_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Extract entities, and optionally sentiment, using Amazon Comprehend"""
     request_id = context.aws_request_id
     contract_id = event.get('contract_id')
-    extracted_text = event.get('extracted_text', '')
+    text_key = event.get('extracted_text_key')
+    created_at = event.get('created_at')
     
     try:
         log_with_context(
             logger, 'info',
-            "Starting AI analysis",
+            "Starting Comprehend analysis",
             contract_id=contract_id,
             request_id=request_id
         )
         
-        # Update status to processing
-        update_contract_status(contract_id, 'processing_ai_analysis')
+        # Failed Comprehend calls fall back to defaults; only loading the text fails the branch
+        entity_analysis, sentiment_analysis = async_clients.run(run_comprehend_analyses(text_key))
         
-        # Perform contract analysis using Bedrock
-        analysis_results = analyze_contract_with_bedrock(extracted_text)
+        return {
+            'entity_analysis': entity_analysis,
+            'sentiment_analysis': sentiment_analysis
+        }
         
-        # Perform sentiment analysis using Comprehend
-        sentiment_analysis = analyze_sentiment_with_comprehend(extracted_text)
+    except Exception as e:
+        logger.error(
+            f"Comprehend analysis failed: {str(e)}",
+            extra={'contract_id': contract_id, 'request_id': request_id}
+        )
+        mark_analysis_failed(contract_id, created_at)
+        raise e
+
+def merge_and_store(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Combine the parallel analyses, score the contract and store the results"""
+    request_id = context.aws_request_id
+    contract_id = event.get('contract_id')
+    created_at = event.get('created_at')
+    analysis = event['analysis']
+    
+    try:
+        analysis_results = analysis['analysis_results']
+        entity_analysis = analysis['entity_analysis']
         
-        # Extract entities using Comprehend
-        entity_analysis = extract_entities_with_comprehend(extracted_text)
+        # Sentiment comes from the Bedrock analysis unless Comprehend sentiment is enabled
+        sentiment_analysis = analysis.get('comprehend_sentiment') or analysis['bedrock_sentiment']
         
         # Combine all analysis results
         comprehensive_analysis = {
@@ -57,19 +167,25 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         # Store analysis results in DynamoDB
         timestamp = generate_timestamp()
+        update_expression = 'SET analysis_results = :analysis, risk_score = :risk, key_terms = :terms, missing_clauses = :missing, #status = :status, updated_at = :timestamp'
+        expression_values = {
+            ':analysis': comprehensive_analysis,
+            ':risk': risk_score,
+            ':terms': analysis_results.get('key_terms', []),
+            ':missing': analysis_results.get('missing_clauses', []),
+            ':status': 'analysis_completed',
+            ':timestamp': timestamp
+        }
+        if created_at:
+            update_expression += ', status_created_at = :status_created_at'
+            expression_values[':status_created_at'] = build_status_sort_key('analysis_completed', created_at)
+        
         try:
             table.update_item(
                 Key={'contract_id': contract_id},
-                UpdateExpression='SET analysis_results = :analysis, risk_score = :risk, key_terms = :terms, missing_clauses = :missing, #status = :status, updated_at = :timestamp',
+                UpdateExpression=update_expression,
                 ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={
-                    ':analysis': comprehensive_analysis,
-                    ':risk': risk_score,
-                    ':terms': analysis_results.get('key_terms', []),
-                    ':missing': analysis_results.get('missing_clauses', []),
-                    ':status': 'analysis_completed',
-                    ':timestamp': timestamp
-                }
+                ExpressionAttributeValues=expression_values
             )
         except Exception as e:
             logger.error(
@@ -99,43 +215,178 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             f"AI analysis failed: {str(e)}",
             extra={'contract_id': contract_id, 'request_id': request_id}
         )
-        
-        # Update status to failed
-        try:
-            update_contract_status(contract_id, 'ai_analysis_failed')
-        except:
-            pass  # Don't fail if status update fails
-        
+        mark_analysis_failed(contract_id, created_at)
         raise e
 
-def analyze_contract_with_bedrock(text: str) -> Dict[str, Any]:
+def mark_analysis_failed(contract_id: str, created_at: Optional[str]) -> None:
+    """Record the failed analysis without masking the original error"""
+    try:
+        update_contract_status(contract_id, 'ai_analysis_failed', created_at)
+    except:
+        pass  # Don't fail if status update fails
+
+async def run_bedrock_analysis(text_key: str) -> Dict[str, Any]:
+    """Run the Bedrock analysis, reusing the analysis cache"""
+    await async_clients.open('bedrock-runtime', 's3')
+    text = await load_extracted_text(text_key)
+    return await analyze_contract_with_bedrock(text)
+
+async def run_comprehend_analyses(text_key: str) -> tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Run the Comprehend calls concurrently"""
+    await async_clients.open('comprehend', 's3')
+    text = await load_extracted_text(text_key)
+    
+    # Comprehend calls cover the whole document in one batched request each
+    chunks = chunk_for_comprehend(text)
+    
+    if not COMPREHEND_SENTIMENT_ENABLED:
+        return await extract_entities_with_comprehend(chunks), None
+    
+    entity_analysis, sentiment_analysis = await asyncio.gather(
+        extract_entities_with_comprehend(chunks),
+        analyze_sentiment_with_comprehend(chunks)
+    )
+    return entity_analysis, sentiment_analysis
+
+async def load_extracted_text(text_key: str) -> str:
+    """Download the text stored by the text extraction step"""
+    try:
+        response = await async_clients.client('s3').get_object(Bucket=DOCUMENTS_BUCKET, Key=text_key)
+        compressed_text = await response['Body'].read()
+    except Exception as e:
+        raise AIAnalysisError(f"Failed to load extracted text: {str(e)}")
+    return gzip.decompress(compressed_text).decode('utf-8')
+
+def build_neutral_sentiment() -> Dict[str, Any]:
+    """Default sentiment used when no sentiment analysis is available"""
+    return {
+        'sentiment': 'NEUTRAL',
+        'sentiment_scores': {
+            'Positive': 0.0,
+            'Negative': 0.0,
+            'Neutral': 1.0,
+            'Mixed': 0.0
+        }
+    }
+
+def extract_sentiment_from_analysis(analysis_results: Dict[str, Any]) -> Dict[str, Any]:
+    """Move the sentiment field of the Bedrock analysis into the Comprehend result format"""
+    sentiment = analysis_results.pop('sentiment', None)
+    try:
+        scores = sentiment['scores']
+        return {
+            'sentiment': str(sentiment['label']).upper(),
+            'sentiment_scores': {
+                label: float(scores.get(label, 0.0))
+                for label in ('Positive', 'Negative', 'Neutral', 'Mixed')
+            }
+        }
+    except (KeyError, TypeError, ValueError, AttributeError):
+        logger.warning("Bedrock analysis did not include a usable sentiment")
+        return build_neutral_sentiment()
+
+class JsonObjectScanner:
+    """Track brace depth across streamed text to spot the end of the first JSON object"""
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """Scan more text, returning True once the first JSON object is complete"""
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '{':
+                self.depth += 1
+            elif char == '}' and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return True
+            elif char == '"' and self.depth:
+                self.in_string = True
+        return False
+
+def parse_analysis_text(analysis_text: str) -> Optional[Dict[str, Any]]:
+    """Parse the JSON analysis out of the model's response text"""
+    # Look for JSON content in the response
+    match = _JSON_OBJECT_PATTERN.search(analysis_text)
+    if match:
+        try:
+            return orjson.loads(match.group())
+        except orjson.JSONDecodeError:
+            pass
+    return None
+
+def build_unstructured_analysis(analysis_text: str) -> Dict[str, Any]:
+    """Wrap a response without usable JSON as the analysis summary"""
+    return {
+        "key_terms": [],
+        "risks": [],
+        "missing_clauses": [],
+        "unusual_provisions": [],
+        "compliance_issues": [],
+        "recommendations": [],
+        "summary": analysis_text
+    }
+
+def build_analysis_cache_key(prompt: str) -> str:
+    """Build the cache item key for a prompt sent to the configured model"""
+    digest = hashlib.blake2b(f"{BEDROCK_MODEL_ID}\0{prompt}".encode('utf-8'), digest_size=16).hexdigest()
+    return f"cache#bedrock#{digest}"
+
+async def get_cached_analysis(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Get a previously stored Bedrock analysis, if any"""
+    try:
+        # The cache table's client is synchronous, so keep it off the event loop
+        response = await asyncio.to_thread(
+            cache_table.get_item,
+            Key={'contract_id': cache_key},
+            ProjectionExpression='analysis'
+        )
+    except Exception as e:
+        logger.warning(f"Failed to read cached analysis: {str(e)}")
+        return None
+    
+    item = response.get('Item')
+    return orjson.loads(item['analysis']) if item else None
+
+async def store_cached_analysis(cache_key: str, analysis: Dict[str, Any]) -> None:
+    """Store a Bedrock analysis so identical contract texts skip the model call"""
+    try:
+        await asyncio.to_thread(
+            cache_table.put_item,
+            Item={
+                'contract_id': cache_key,
+                'analysis': orjson.dumps(analysis).decode('utf-8'),
+                'model_id': BEDROCK_MODEL_ID,
+                'expires_at': int(time.time()) + ANALYSIS_CACHE_TTL
+            }
+        )
+    except Exception as e:
+        # Don't fail the analysis if the cache write fails
+        logger.warning(f"Failed to store cached analysis: {str(e)}")
+
+async def analyze_contract_with_bedrock(text: str) -> Dict[str, Any]:
     """Analyze contract using Amazon Bedrock Claude model"""
     try:
-        prompt = f"""
-        Analyze the following contract text and provide a comprehensive analysis. Focus on:
-        1. Key terms and conditions
-        2. Potential risks and liabilities
-        3. Missing standard clauses
-        4. Unusual or concerning provisions
-        5. Compliance and regulatory considerations
-        
-        Provide your analysis in the following JSON format:
-        {{
-            "key_terms": ["list of key terms and conditions"],
-            "risks": ["list of identified risks"],
-            "missing_clauses": ["list of standard clauses that appear to be missing"],
-            "unusual_provisions": ["list of unusual or concerning provisions"],
-            "compliance_issues": ["list of potential compliance issues"],
-            "recommendations": ["list of recommendations for improvement"],
-            "summary": "Brief summary of the contract analysis"
-        }}
-        
-        Contract text:
-        {text[:8000]}  # Limit text to avoid token limits
-        """
-        
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-04",
+        prompt = _PROMPT_TEMPLATE.format(text=text[:8000])  # Limit text to avoid token limits
+        
+        # Identical prompts to the same model reuse the stored analysis
+        cache_key = build_analysis_cache_key(prompt)
+        cached_analysis = await get_cached_analysis(cache_key)
+        if cached_analysis is not None:
+            logger.info("Using cached Bedrock analysis")
+            return cached_analysis
+        
+        body = orjson.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": 4000,
             "messages": [
                 {
@@ -145,105 +396,138 @@ def analyze_contract_with_bedrock(text: str) -> Dict[str, Any]:
             ]
         })
         
-        response = bedrock_client.invoke_model(
+        response = await async_clients.client('bedrock-runtime').invoke_model_with_response_stream(
             modelId=BEDROCK_MODEL_ID,
             body=body,
             contentType='application/json'
         )
         
-        response_body = json.loads(response['body'].read())
-        
-        # Extract the analysis from the response
-        analysis_text = response_body['content'][0]['text']
-        
-        # Try to parse JSON from the response
+        # Collect the streamed analysis text, stopping as soon as the JSON object is complete
+        text_parts = []
+        scanner = JsonObjectScanner()
         try:
-            # Look for JSON content in the response
-            json_start = analysis_text.find('{')
-            json_end = analysis_text.rfind('}') + 1
-            if json_start != -1 and json_end != -1:
-                analysis_json = json.loads(analysis_text[json_start:json_end])
-                return analysis_json
-            else:
-                # If no JSON found, create structured response
-                return {
-                    "key_terms": [],
-                    "risks": [],
-                    "missing_clauses": [],
-                    "unusual_provisions": [],
-                    "compliance_issues": [],
-                    "recommendations": [],
-                    "summary": analysis_text
-                }
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return raw analysis
-            return {
-                "key_terms": [],
-                "risks": [],
-                "missing_clauses": [],
-                "unusual_provisions": [],
-                "compliance_issues": [],
-                "recommendations": [],
-                "summary": analysis_text
-            }
-            
+            async for event in response['body']:
+                chunk = event.get('chunk')
+                if not chunk:
+                    continue
+                
+                chunk_data = orjson.loads(chunk['bytes'])
+                if chunk_data.get('type') != 'content_block_delta':
+                    continue
+                
+                text_delta = chunk_data['delta'].get('text', '')
+                text_parts.append(text_delta)
+                if scanner.feed(text_delta):
+                    break
+        finally:
+            # A partly read stream would otherwise hold its pooled connection until garbage collection
+            response['body'].close()
+        
+        analysis_text = ''.join(text_parts)
+        
+        analysis = parse_analysis_text(analysis_text)
+        if analysis is None:
+            # Don't cache responses without usable JSON so a retry can do better
+            return build_unstructured_analysis(analysis_text)
+        
+        await store_cached_analysis(cache_key, analysis)
+        return analysis
+        
     except Exception as e:
         logger.error(f"Bedrock analysis failed: {str(e)}")
         raise AIAnalysisError(f"Failed to analyze contract with Bedrock: {str(e)}")
 
-def analyze_sentiment_with_comprehend(text: str) -> Dict[str, Any]:
+def chunk_for_comprehend(text: str, size: int = COMPREHEND_CHUNK_BYTES) -> List[str]:
+    """Split text on sentence boundaries into chunks for the Comprehend batch APIs"""
+    chunks = []
+    current = []
+    current_size = 0
+    
+    for sentence in _SENTENCE_BOUNDARY_PATTERN.split(text):
+        if not sentence:
+            continue
+        sentence_size = len(sentence.encode('utf-8')) + 1
+        
+        # Hard-split sentences that don't fit in a chunk on their own
+        if sentence_size > size:
+            pieces = [sentence[i:i + size // 4] for i in range(0, len(sentence), size // 4)]
+        else:
+            pieces = [sentence]
+        
+        for piece in pieces:
+            piece_size = len(piece.encode('utf-8')) + 1
+            if current and current_size + piece_size > size:
+                chunks.append(' '.join(current))
+                if len(chunks) == COMPREHEND_MAX_BATCH:
+                    return chunks
+                current = []
+                current_size = 0
+            current.append(piece)
+            current_size += piece_size
+    
+    if current:
+        chunks.append(' '.join(current))
+    return chunks[:COMPREHEND_MAX_BATCH]
+
+async def analyze_sentiment_with_comprehend(chunks: List[str]) -> Dict[str, Any]:
     """Analyze sentiment using Amazon Comprehend"""
     try:
-        # Limit text length for Comprehend
-        text_sample = text[:5000] if len(text) > 5000 else text
-        
-        response = comprehend_client.detect_sentiment(
-            Text=text_sample,
+        response = await async_clients.client('comprehend').batch_detect_sentiment(
+            TextList=chunks,
             LanguageCode='en'
         )
         
+        # Average the scores of each chunk, weighted by chunk length
+        totals = {'Positive': 0.0, 'Negative': 0.0, 'Neutral': 0.0, 'Mixed': 0.0}
+        total_weight = 0
+        for result in response['ResultList']:
+            weight = len(chunks[result['Index']])
+            total_weight += weight
+            for label, score in result['SentimentScore'].items():
+                totals[label] += score * weight
+        
+        if not total_weight:
+            raise AIAnalysisError("No chunks were analyzed")
+        
+        sentiment_scores = {label: score / total_weight for label, score in totals.items()}
         return {
-            'sentiment': response['Sentiment'],
-            'sentiment_scores': response['SentimentScore']
+            'sentiment': max(sentiment_scores, key=sentiment_scores.get).upper(),
+            'sentiment_scores': sentiment_scores
         }
         
     except Exception as e:
         logger.warning(f"Comprehend sentiment analysis failed: {str(e)}")
-        return {
-            'sentiment': 'NEUTRAL',
-            'sentiment_scores': {
-                'Positive': 0.0,
-                'Negative': 0.0,
-                'Neutral': 1.0,
-                'Mixed': 0.0
-            }
-        }
+        return build_neutral_sentiment()
 
-def extract_entities_with_comprehend(text: str) -> Dict[str, Any]:
+async def extract_entities_with_comprehend(chunks: List[str]) -> Dict[str, Any]:
     """Extract entities using Amazon Comprehend"""
     try:
-        # Limit text length for Comprehend
-        text_sample = text[:5000] if len(text) > 5000 else text
-        
-        response = comprehend_client.detect_entities(
-            Text=text_sample,
+        response = await async_clients.client('comprehend').batch_detect_entities(
+            TextList=chunks,
             LanguageCode='en'
         )
         
+        # Deduplicate entities across chunks, keeping the highest score
+        best_scores = {}
+        for result in response['ResultList']:
+            for entity in result['Entities']:
+                entity_key = (entity['Type'], entity['Text'])
+                if entity['Score'] > best_scores.get(entity_key, -1.0):
+                    best_scores[entity_key] = entity['Score']
+        
         # Group entities by type
         entities_by_type = {}
-        for entity in response['Entities']:
-            entity_type = entity['Type']
+        for (entity_type, entity_text), score in best_scores.items():
             if entity_type not in entities_by_type:
                 entities_by_type[entity_type] = []
             entities_by_type[entity_type].append({
-                'text': entity['Text'],
-                'confidence': entity['Score']
+                'text': entity_text,
+                'confidence': score
             })
         
         return {
             'entities': entities_by_type,
-            'total_entities': len(response['Entities'])
+            'total_entities': len(best_scores)
         }
         
     except Exception as e:
@@ -256,50 +540,39 @@ def extract_entities_with_comprehend(text: str) -> Dict[str, Any]:
 def calculate_risk_score(analysis_results: Dict[str, Any], sentiment_analysis: Dict[str, Any]) -> float:
     """Calculate overall risk score based on analysis results"""
     try:
-        risk_score = 0.0
-        
-        # Base risk from number of identified risks
-        risks = analysis_results.get('risks', [])
-        risk_score += len(risks) * 10  # 10 points per risk
-        
-        # Risk from missing clauses
-        missing_clauses = analysis_results.get('missing_clauses', [])
-        risk_score += len(missing_clauses) * 5  # 5 points per missing clause
-        
-        # Risk from unusual provisions
-        unusual_provisions = analysis_results.get('unusual_provisions', [])
-        risk_score += len(unusual_provisions) * 7  # 7 points per unusual provision
-        
-        # Risk from compliance issues
-        compliance_issues = analysis_results.get('compliance_issues', [])
-        risk_score += len(compliance_issues) * 15  # 15 points per compliance issue
+        # Weighted count of the identified issues
+        risk_score = sum(
+            len(analysis_results.get(field, [])) * weight
+            for field, weight in _RISK_WEIGHTS
+        )
         
         # Sentiment-based risk adjustment
         sentiment_scores = sentiment_analysis.get('sentiment_scores', {})
-        negative_score = sentiment_scores.get('Negative', 0.0)
-        risk_score += negative_score * 20  # Negative sentiment increases risk
+        risk_score += sentiment_scores.get('Negative', 0.0) * _NEGATIVE_SENTIMENT_WEIGHT
         
         # Normalize to 0-100 scale
-        risk_score = min(100.0, max(0.0, risk_score))
-        
-        return round(risk_score, 2)
+        return round(min(100.0, max(0.0, risk_score)), 2)
         
     except Exception as e:
         logger.warning(f"Risk score calculation failed: {str(e)}")
         return 50.0  # Default medium risk
 
-def update_contract_status(contract_id: str, status: str) -> None:
+def update_contract_status(contract_id: str, status: str, created_at: Optional[str] = None) -> None:
     """Update contract status in DynamoDB"""
-    try:
-        table.update_item(
-            Key={'contract_id': contract_id},
-            UpdateExpression='SET #status = :status, updated_at = :timestamp',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={
-                ':status': status,
-                ':timestamp': generate_timestamp()
-            }
-        )
-    except Exception as e:
-        logger.warning(f"Failed to update contract status: {str(e)}")
-        # Don't raise exception for status update failures
\ No newline at end of file
+    update_expression = 'SET #status = :status, updated_at = :timestamp'
+    expression_values = {
+        ':status': status,
+        ':timestamp': generate_timestamp()
+    }
+    
+    # Keep the status GSI sort key in step with the status
+    if created_at:
+        update_expression += ', status_created_at = :status_created_at'
+        expression_values[':status_created_at'] = build_status_sort_key(status, created_at)
+    
+    table.update_item(
+        Key={'contract_id': contract_id},
+        UpdateExpression=update_expression,
+        ExpressionAttributeNames={'#status': 'status'},
+        ExpressionAttributeValues=expression_values
+    )
\ No newline at end of file
@@ -1,8 +1,10 @@
 import json
 import os
-import boto3
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, NoReturn, Optional
 from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from common.cache import ContainerCache
+from common.clients import get_client, get_read_table
 from common.logger import get_logger, log_with_context
 from common.utils import (
     create_api_response, 
@@ -13,20 +15,45 @@ from common.exceptions import (
     ValidationError, 
     DocumentNotFoundError, 
     AuthorizationError,
-    DatabaseError
+    DatabaseError,
+    ServiceUnavailableError
 )
 
 logger = get_logger(__name__)
 
 # Initialize AWS clients
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
+s3_client = get_client('s3')
 
 # Environment variables
 DOCUMENTS_BUCKET = os.environ['DOCUMENTS_BUCKET']
 METADATA_TABLE = os.environ['METADATA_TABLE']
 
-table = dynamodb.Table(METADATA_TABLE)
+# This handler only reads, so all table access goes through DAX when configured
+dax_table = get_read_table(METADATA_TABLE)
+
+# Contracts in a terminal status no longer change, so warm containers can
+# serve repeat reads without going back to DynamoDB
+TERMINAL_STATUSES = frozenset({'analysis_completed', 'ai_analysis_failed', 'text_extraction_failed'})
+contract_cache = ContainerCache(maxsize=1024, ttl=60)
+
+# Attributes read for the contract details and listing responses, so the
+# large analysis results aren't transferred when they aren't returned.
+# user_id is needed for the ownership check.
+CONTRACT_DETAIL_PROJECTION = (
+    'contract_id, user_id, filename, file_size, content_type, #status, '
+    'created_at, updated_at, page_count, extraction_confidence, risk_score'
+)
+CONTRACT_LIST_PROJECTION = (
+    'contract_id, filename, file_size, content_type, #status, '
+    'created_at, updated_at, risk_score, page_count'
+)
+
+# Error codes DynamoDB and DAX return when a request should be retried later
+THROTTLING_ERROR_CODES = frozenset({
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded'
+})
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle API requests for contract operations"""
@@ -51,7 +78,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 # Get contract analysis
                 contract_id = path_parameters.get('contract_id')
                 return get_contract_analysis(contract_id, user_id, request_id)
-            elif '/contracts/' in path and contract_id := path_parameters.get('contract_id'):
+            elif '/contracts/' in path and (contract_id := path_parameters.get('contract_id')):
                 # Get specific contract
                 return get_contract(contract_id, user_id, request_id)
             elif path == '/contracts':
@@ -70,6 +97,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     except DocumentNotFoundError as e:
         logger.info(f"Document not found: {str(e)}", extra={'request_id': request_id})
         return create_error_response(e, request_id)
+    except ServiceUnavailableError as e:
+        logger.warning(f"Service unavailable: {str(e)}", extra={'request_id': request_id})
+        return create_error_response(e, request_id)
     except DatabaseError as e:
         logger.error(f"Database error: {str(e)}", extra={'request_id': request_id})
         return create_error_response(e, request_id)
@@ -77,6 +107,46 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         logger.error(f"Unexpected error: {str(e)}", extra={'request_id': request_id})
         return create_error_response(e, request_id)
 
+def raise_database_error(error: ClientError, message: str, **context: Any) -> NoReturn:
+    """Raise the API error matching a DynamoDB client error"""
+    error_code = error.response['Error']['Code']
+    logger.error(f"{message}: {error_code}", extra=context)
+    
+    if error_code in THROTTLING_ERROR_CODES:
+        raise ServiceUnavailableError("Too many requests, please retry")
+    raise DatabaseError(message)
+
+def fetch_contract(contract_id: str, user_id: str, request_id: str,
+                   projection: Optional[str] = None) -> Dict[str, Any]:
+    """Fetch a contract item, serving terminal contracts from the container cache"""
+    # Items read with different projections are cached separately
+    cache_key = (contract_id, projection)
+    contract = contract_cache.get(cache_key)
+    if contract is not None:
+        return contract
+    
+    get_params = {'Key': {'contract_id': contract_id}}
+    if projection:
+        get_params['ProjectionExpression'] = projection
+        get_params['ExpressionAttributeNames'] = {'#status': 'status'}
+    
+    try:
+        response = dax_table.get_item(**get_params)
+    except ClientError as e:
+        raise_database_error(
+            e, "Failed to fetch contract",
+            contract_id=contract_id, user_id=user_id, request_id=request_id
+        )
+    
+    if 'Item' not in response:
+        raise DocumentNotFoundError(contract_id)
+    
+    contract = response['Item']
+    if contract.get('status') in TERMINAL_STATUSES:
+        contract_cache.set(cache_key, contract)
+    
+    return contract
+
 def get_contract(contract_id: str, user_id: str, request_id: str) -> Dict[str, Any]:
     """Get contract metadata and details"""
     if not contract_id:
@@ -90,47 +160,32 @@ def get_contract(contract_id: str, user_id: str, request_id: str) -> Dict[str, A
         request_id=request_id
     )
     
-    try:
-        response = table.get_item(Key={'contract_id': contract_id})
-        
-        if 'Item' not in response:
-            raise DocumentNotFoundError(contract_id)
-        
-        contract = response['Item']
-        
-        # Verify user ownership
-        if contract.get('user_id') != user_id:
-            raise AuthorizationError("Access denied to this contract")
-        
-        # Remove sensitive fields
-        contract_data = {
-            'contract_id': contract['contract_id'],
-            'filename': contract['filename'],
-            'file_size': contract['file_size'],
-            'content_type': contract['content_type'],
-            'status': contract['status'],
-            'created_at': contract['created_at'],
-            'updated_at': contract['updated_at']
-        }
-        
-        # Add optional fields if they exist
-        if 'page_count' in contract:
-            contract_data['page_count'] = contract['page_count']
-        if 'extraction_confidence' in contract:
-            contract_data['extraction_confidence'] = contract['extraction_confidence']
-        if 'risk_score' in contract:
-            contract_data['risk_score'] = contract['risk_score']
-        
-        return create_api_response(200, contract_data)
-        
-    except Exception as e:
-        if isinstance(e, (DocumentNotFoundError, AuthorizationError)):
-            raise e
-        logger.error(
-            f"Failed to fetch contract: {str(e)}",
-            extra={'contract_id': contract_id, 'user_id': user_id, 'request_id': request_id}
-        )
-        raise DatabaseError("Failed to fetch contract details")
+    contract = fetch_contract(contract_id, user_id, request_id, CONTRACT_DETAIL_PROJECTION)
+    
+    # Verify user ownership
+    if contract.get('user_id') != user_id:
+        raise AuthorizationError("Access denied to this contract")
+    
+    # Remove sensitive fields
+    contract_data = {
+        'contract_id': contract['contract_id'],
+        'filename': contract['filename'],
+        'file_size': contract['file_size'],
+        'content_type': contract['content_type'],
+        'status': contract['status'],
+        'created_at': contract['created_at'],
+        'updated_at': contract['updated_at']
+    }
+    
+    # Add optional fields if they exist
+    if 'page_count' in contract:
+        contract_data['page_count'] = contract['page_count']
+    if 'extraction_confidence' in contract:
+        contract_data['extraction_confidence'] = contract['extraction_confidence']
+    if 'risk_score' in contract:
+        contract_data['risk_score'] = contract['risk_score']
+    
+    return create_api_response(200, contract_data)
 
 def get_contract_analysis(contract_id: str, user_id: str, request_id: str) -> Dict[str, Any]:
     """Get contract analysis results"""
@@ -145,46 +200,31 @@ def get_contract_analysis(contract_id: str, user_id: str, request_id: str) -> Di
         request_id=request_id
     )
     
-    try:
-        response = table.get_item(Key={'contract_id': contract_id})
-        
-        if 'Item' not in response:
-            raise DocumentNotFoundError(contract_id)
-        
-        contract = response['Item']
-        
-        # Verify user ownership
-        if contract.get('user_id') != user_id:
-            raise AuthorizationError("Access denied to this contract")
-        
-        # Check if analysis is available
-        if 'analysis_results' not in contract:
-            return create_api_response(200, {
-                'contract_id': contract_id,
-                'status': contract.get('status', 'unknown'),
-                'message': 'Analysis not yet available'
-            })
-        
-        analysis_data = {
+    contract = fetch_contract(contract_id, user_id, request_id)
+    
+    # Verify user ownership
+    if contract.get('user_id') != user_id:
+        raise AuthorizationError("Access denied to this contract")
+    
+    # Check if analysis is available
+    if 'analysis_results' not in contract:
+        return create_api_response(200, {
             'contract_id': contract_id,
-            'status': contract['status'],
-            'analysis_results': contract['analysis_results'],
-            'risk_score': contract.get('risk_score', 0),
-            'key_terms': contract.get('key_terms', []),
-            'missing_clauses': contract.get('missing_clauses', []),
-            'updated_at': contract['updated_at']
-        }
-        
-        return create_api_response(200, analysis_data)
-        
-    except Exception as e:
-        if isinstance(e, (DocumentNotFoundError, AuthorizationError)):
-            raise e
-        logger.error(
-            f"Failed to fetch contract analysis: {str(e)}",
-            extra={'contract_id': contract_id, 'user_id': user_id, 'request_id': request_id}
-        )
-        raise DatabaseError("Failed to fetch contract analysis")
+            'status': contract.get('status', 'unknown'),
+            'message': 'Analysis not yet available'
+        })
+    
+    analysis_data = {
+        'contract_id': contract_id,
+        'status': contract['status'],
+        'analysis_results': contract['analysis_results'],
+        'risk_score': contract.get('risk_score', 0),
+        'key_terms': contract.get('key_terms', []),
+        'missing_clauses': contract.get('missing_clauses', []),
+        'updated_at': contract['updated_at']
+    }
+    
+    return create_api_response(200, analysis_data)
 
 def list_contracts(user_id: str, query_parameters: Dict[str, str], request_id: str) -> Dict[str, Any]:
     """List user's contracts with optional filtering and pagination"""
@@ -195,70 +235,71 @@ def list_contracts(user_id: str, query_parameters: Dict[str, str], request_id: s
         request_id=request_id
     )
     
+    # Parse query parameters
     try:
-        # Parse query parameters
         limit = min(int(query_parameters.get('limit', '10')), 100)  # Max 100 items
-        status_filter = query_parameters.get('status')
-        last_evaluated_key = query_parameters.get('last_key')
-        
-        # Build query parameters
-        query_params = {
-            'IndexName': 'user-id-created-at-index',
-            'KeyConditionExpression': Key('user_id').eq(user_id),
-            'Limit': limit,
-            'ScanIndexForward': False  # Sort by created_at descending
+    except ValueError:
+        raise ValidationError("Invalid limit")
+    status_filter = query_parameters.get('status')
+    last_evaluated_key = query_parameters.get('last_key')
+    
+    # Build query parameters
+    query_params = {
+        'IndexName': 'user-id-created-at-index',
+        'KeyConditionExpression': Key('user_id').eq(user_id),
+        'Limit': limit,
+        'ScanIndexForward': False,  # Sort by created_at descending
+        'ProjectionExpression': CONTRACT_LIST_PROJECTION,
+        'ExpressionAttributeNames': {'#status': 'status'}
+    }
+    
+    # Filter by status through the index key rather than a post-read filter
+    if status_filter:
+        query_params['IndexName'] = 'user-id-status-created-at-index'
+        query_params['KeyConditionExpression'] = (
+            Key('user_id').eq(user_id) & Key('status_created_at').begins_with(f"{status_filter}#")
+        )
+    
+    # Add pagination token if provided
+    if last_evaluated_key:
+        try:
+            query_params['ExclusiveStartKey'] = json.loads(last_evaluated_key)
+        except json.JSONDecodeError:
+            raise ValidationError("Invalid pagination token")
+    
+    try:
+        response = dax_table.query(**query_params)
+    except ClientError as e:
+        raise_database_error(e, "Failed to list contracts", user_id=user_id, request_id=request_id)
+    
+    # Format contract data
+    contracts = []
+    for item in response.get('Items', []):
+        contract_data = {
+            'contract_id': item['contract_id'],
+            'filename': item['filename'],
+            'file_size': item['file_size'],
+            'content_type': item['content_type'],
+            'status': item['status'],
+            'created_at': item['created_at'],
+            'updated_at': item['updated_at']
         }
         
-        # Add pagination token if provided
-        if last_evaluated_key:
-            try:
-                query_params['ExclusiveStartKey'] = json.loads(last_evaluated_key)
-            except json.JSONDecodeError:
-                raise ValidationError("Invalid pagination token")
-        
-        # Add status filter if provided
-        if status_filter:
-            query_params['FilterExpression'] = Key('status').eq(status_filter)
-        
-        response = table.query(**query_params)
-        
-        # Format contract data
-        contracts = []
-        for item in response.get('Items', []):
-            contract_data = {
-                'contract_id': item['contract_id'],
-                'filename': item['filename'],
-                'file_size': item['file_size'],
-                'content_type': item['content_type'],
-                'status': item['status'],
-                'created_at': item['created_at'],
-                'updated_at': item['updated_at']
-            }
+        # Add optional fields
+        if 'risk_score' in item:
+            contract_data['risk_score'] = item['risk_score']
+        if 'page_count' in item:
+            contract_data['page_count'] = item['page_count']
             
-            # Add optional fields
-            if 'risk_score' in item:
-                contract_data['risk_score'] = item['risk_score']
-            if 'page_count' in item:
-                contract_data['page_count'] = item['page_count']
-                
-            contracts.append(contract_data)
-        
-        result = {
-            'contracts': contracts,
-            'count': len(contracts)
-        }
-        
-        # Add pagination token if there are more items
-        if 'LastEvaluatedKey' in response:
-            result['last_key'] = json.dumps(response['LastEvaluatedKey'])
-        
-        return create_api_response(200, result)
-        
-    except ValidationError:
-        raise
-    except Exception as e:
-        logger.error(
-            f"Failed to list contracts: {str(e)}",
-            extra={'user_id': user_id, 'request_id': request_id}
-        )
-        raise DatabaseError("Failed to list contracts")
\ No newline at end of file
+        contracts.append(contract_data)
+    
+    result = {
+        'contracts': contracts,
+        'count': len(contracts)
+    }
+    
+    # Add pagination token if there are more items
+    if 'LastEvaluatedKey' in response:
+        result['last_key'] = json.dumps(response['LastEvaluatedKey'])
+    
+    return create_api_response(200, result)
@@ -1,9 +1,13 @@
 import json
 import os
-import boto3
 from typing import Dict, Any
+from urllib.parse import quote
+from botocore.auth import S3SigV4QueryAuth
+from botocore.awsrequest import AWSRequest
+from common.clients import get_client, get_credentials, get_table
 from common.logger import get_logger, log_with_context
 from common.utils import (
+    build_status_sort_key,
     generate_contract_id, 
     generate_timestamp, 
     create_api_response, 
@@ -16,16 +20,19 @@ from common.exceptions import ValidationError, DocumentUploadError, DatabaseErro
 logger = get_logger(__name__)
 
 # Initialize AWS clients
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-stepfunctions_client = boto3.client('stepfunctions')
+s3_client = get_client('s3')
 
 # Environment variables
 DOCUMENTS_BUCKET = os.environ['DOCUMENTS_BUCKET']
 METADATA_TABLE = os.environ['METADATA_TABLE']
-STATE_MACHINE_ARN = os.environ.get('STATE_MACHINE_ARN')
 
-table = dynamodb.Table(METADATA_TABLE)
+table = get_table(METADATA_TABLE)
+
+# Upload URLs are signed locally, so the endpoint and credentials are resolved once
+AWS_REGION = s3_client.meta.region_name
+BUCKET_ENDPOINT = f"https://{DOCUMENTS_BUCKET}.s3.{AWS_REGION}.amazonaws.com"
+UPLOAD_URL_EXPIRES = 3600  # 1 hour
+credentials = get_credentials()
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle document upload requests"""
@@ -61,15 +68,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         s3_key = f"contracts/{user_id}/{contract_id}/{body['filename']}"
         
         # Generate presigned URL for upload
-        presigned_url = s3_client.generate_presigned_url(
-            'put_object',
-            Params={
-                'Bucket': DOCUMENTS_BUCKET,
-                'Key': s3_key,
-                'ContentType': body['content_type']
-            },
-            ExpiresIn=3600  # 1 hour
-        )
+        presigned_url = generate_upload_url(s3_key, body['content_type'])
         
         # Store metadata in DynamoDB
         metadata = {
@@ -80,60 +79,14 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'content_type': body['content_type'],
             's3_key': s3_key,
             'status': 'uploaded',
+            'status_created_at': build_status_sort_key('uploaded', timestamp),
             'created_at': timestamp,
             'updated_at': timestamp
         }
         
-        try:
-            table.put_item(Item=metadata)
-            logger.info(
-                "Metadata stored successfully",
-                extra={
-                    'contract_id': contract_id,
-                    'user_id': user_id,
-                    'request_id': request_id
-                }
-            )
-        except Exception as e:
-            logger.error(
-                f"Failed to store metadata: {str(e)}",
-                extra={
-                    'contract_id': contract_id,
-                    'user_id': user_id,
-                    'request_id': request_id
-                }
-            )
-            raise DatabaseError("Failed to store contract metadata")
-        
-        # Start Step Functions execution if configured
-        if STATE_MACHINE_ARN:
-            try:
-                stepfunctions_client.start_execution(
-                    stateMachineArn=STATE_MACHINE_ARN,
-                    name=f"contract-{contract_id}",
-                    input=json.dumps({
-                        'contract_id': contract_id,
-                        's3_bucket': DOCUMENTS_BUCKET,
-                        's3_key': s3_key
-                    })
-                )
-                logger.info(
-                    "Step Functions execution started",
-                    extra={
-                        'contract_id': contract_id,
-                        'user_id': user_id,
-                        'request_id': request_id
-                    }
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Failed to start Step Functions execution: {str(e)}",
-                    extra={
-                        'contract_id': contract_id,
-                        'user_id': user_id,
-                        'request_id': request_id
-                    }
-                )
+        # Processing starts from the S3 upload event, so the metadata write is
+        # the only AWS call on the request path
+        store_metadata(metadata, user_id, request_id)
         
         response_body = {
             'contract_id': contract_id,
@@ -163,4 +116,42 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         return create_error_response(e, request_id)
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}", extra={'request_id': request_id})
-        return create_error_response(e, request_id)
\ No newline at end of file
+        return create_error_response(e, request_id)
+
+def generate_upload_url(s3_key: str, content_type: str) -> str:
+    """Presign an S3 PUT URL with SigV4 query authentication"""
+    request = AWSRequest(
+        method='PUT',
+        url=f"{BUCKET_ENDPOINT}/{quote(s3_key, safe='/~')}",
+        headers={'Content-Type': content_type}
+    )
+    signer = S3SigV4QueryAuth(
+        credentials.get_frozen_credentials(), 's3', AWS_REGION, expires=UPLOAD_URL_EXPIRES
+    )
+    signer.add_auth(request)
+    return request.url
+
+def store_metadata(metadata: Dict[str, Any], user_id: str, request_id: str) -> None:
+    """Store contract metadata in DynamoDB"""
+    contract_id = metadata['contract_id']
+    
+    try:
+        table.put_item(Item=metadata)
+        logger.info(
+            "Metadata stored successfully",
+            extra={
+                'contract_id': contract_id,
+                'user_id': user_id,
+                'request_id': request_id
+            }
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to store metadata: {str(e)}",
+            extra={
+                'contract_id': contract_id,
+                'user_id': user_id,
+                'request_id': request_id
+            }
+        )
+        raise DatabaseError("Failed to store contract metadata")
\ No newline at end of file
@@ -1,29 +1,85 @@
+import gzip
 import json
 import os
-import boto3
-from typing import Dict, Any, List
+import random
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional
+from common.cache import ContainerCache
+from common.clients import get_client, get_table
 from common.logger import get_logger, log_with_context
 from common.exceptions import TextExtractionError, DatabaseError
-from common.utils import generate_timestamp
+from common.utils import build_status_sort_key, generate_timestamp
 
 logger = get_logger(__name__)
 
 # Initialize AWS clients
-s3_client = boto3.client('s3')
-textract_client = boto3.client('textract')
-dynamodb = boto3.resource('dynamodb')
+s3_client = get_client('s3')
+textract_client = get_client('textract')
 
 # Environment variables
 DOCUMENTS_BUCKET = os.environ['DOCUMENTS_BUCKET']
 METADATA_TABLE = os.environ['METADATA_TABLE']
+# Textract publishes async job completion to this topic using this role
+TEXTRACT_SNS_TOPIC_ARN = os.environ.get('TEXTRACT_SNS_TOPIC_ARN')
+TEXTRACT_SNS_ROLE_ARN = os.environ.get('TEXTRACT_SNS_ROLE_ARN')
 
-table = dynamodb.Table(METADATA_TABLE)
+table = get_table(METADATA_TABLE)
+
+# Files larger than this go through asynchronous Textract processing
+SYNC_EXTRACTION_MAX_BYTES = 5 * 1024 * 1024  # 5MB
+
+# Text from async jobs is gzipped into a multipart upload as result pages
+# arrive; every part but the last has to be at least 5MB
+MULTIPART_PART_BYTES = 5 * 1024 * 1024  # 5MB
+EXTRACTED_TEXT_CONTENT_TYPE = 'text/plain; charset=utf-8'
+
+# Textract job polling: exponential backoff with jitter within a wall-clock budget
+POLL_INITIAL_DELAY_SECONDS = 1.0
+POLL_MAX_DELAY_SECONDS = 10.0
+POLL_BACKOFF_RATE = 1.5
+POLL_BUDGET_SECONDS = 300  # 5 minutes max
+
+# Accepted at upload but not readable by Textract
+UNSUPPORTED_CONTENT_TYPES = frozenset({
+    'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+})
+
+# Items mapping a Textract job to its contract and Step Functions task token
+TEXTRACT_JOB_TTL = 24 * 60 * 60  # 1 day
+
+# Extractions are reused for a user's documents with the same S3 ETag, so retries and
+# duplicate deliveries don't pay for Textract again
+EXTRACTION_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+extraction_cache = ContainerCache(maxsize=256, ttl=300)
+
+# Writes the extraction cache item alongside the contract update
+cache_writer = ThreadPoolExecutor(max_workers=2)
+
+# Update expressions, with variants that also keep the status GSI sort key in step
+STATUS_UPDATE_EXPRESSION = 'SET #status = :status, updated_at = :timestamp'
+RESULT_UPDATE_EXPRESSION = 'SET extracted_text_key = :text_key, page_count = :pages, extraction_confidence = :conf, #status = :status, updated_at = :timestamp'
+SORT_KEY_UPDATE = ', status_created_at = :status_created_at'
+STATUS_UPDATE_EXPRESSION_WITH_SORT_KEY = STATUS_UPDATE_EXPRESSION + SORT_KEY_UPDATE
+RESULT_UPDATE_EXPRESSION_WITH_SORT_KEY = RESULT_UPDATE_EXPRESSION + SORT_KEY_UPDATE
+STATUS_ATTRIBUTE_NAMES = {'#status': 'status'}
+# Results only land while the contract is waiting for text extraction, so a
+# late result can't replace a failure status written after a timeout
+RESULT_CONDITION_EXPRESSION = '#status IN (:uploaded, :status)'
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Extract text from uploaded documents using Amazon Textract"""
     request_id = context.aws_request_id
     contract_id = event.get('contract_id')
     s3_key = event.get('s3_key')
+    created_at = event.get('created_at')
+    file_size = event.get('file_size')
+    content_type = event.get('content_type')
+    etag = event.get('etag')
+    user_id = get_document_owner(s3_key)
+    text_key = build_extracted_text_key(contract_id, user_id, etag)
     
     try:
         log_with_context(
@@ -33,21 +89,21 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             request_id=request_id
         )
         
-        # Update status to processing
-        update_contract_status(contract_id, 'processing_text_extraction')
+        cached_result = check_and_reuse_extraction(contract_id, created_at, content_type, user_id, etag, request_id)
+        if cached_result:
+            return cached_result
         
         # Determine if we need synchronous or asynchronous processing
         # For large documents, use asynchronous processing
         try:
-            s3_response = s3_client.head_object(Bucket=DOCUMENTS_BUCKET, Key=s3_key)
-            file_size = s3_response['ContentLength']
-            
-            if file_size > 5 * 1024 * 1024:  # 5MB threshold
-                # Use asynchronous processing for large files
-                extracted_text, page_count, confidence = extract_text_async(s3_key)
+            # The size comes from the S3 event, so no HEAD request is needed
+            if file_size > SYNC_EXTRACTION_MAX_BYTES:
+                # Use asynchronous processing for large files, streaming the text to S3
+                page_count, confidence = extract_text_async(s3_key, text_key)
             else:
                 # Use synchronous processing for smaller files
                 extracted_text, page_count, confidence = extract_text_sync(s3_key)
+                upload_extracted_text(text_key, extracted_text, contract_id, request_id)
                 
         except Exception as e:
             logger.error(
@@ -56,166 +112,525 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             )
             raise TextExtractionError(f"Failed to extract text from document: {str(e)}")
         
-        # Store extracted text in DynamoDB
-        timestamp = generate_timestamp()
-        try:
-            table.update_item(
-                Key={'contract_id': contract_id},
-                UpdateExpression='SET extracted_text = :text, page_count = :pages, extraction_confidence = :conf, #status = :status, updated_at = :timestamp',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={
-                    ':text': extracted_text,
-                    ':pages': page_count,
-                    ':conf': confidence,
-                    ':status': 'text_extracted',
-                    ':timestamp': timestamp
-                }
-            )
-        except Exception as e:
-            logger.error(
-                f"Failed to update contract metadata: {str(e)}",
-                extra={'contract_id': contract_id, 'request_id': request_id}
-            )
-            raise DatabaseError("Failed to update contract metadata")
+        return store_new_extraction(
+            contract_id, created_at, user_id, etag, text_key, page_count, confidence, request_id
+        )
         
+    except Exception as e:
+        logger.error(
+            f"Text extraction failed: {str(e)}",
+            extra={'contract_id': contract_id, 'request_id': request_id}
+        )
+        mark_extraction_failed(contract_id, created_at)
+        raise e
+
+def start_async_extraction(event: Dict[str, Any], context: Any) -> None:
+    """Start an asynchronous Textract job that reports completion through SNS.
+
+    Step Functions waits on the task token stored with the job until
+    finish_async_extraction reports the result, so no Lambda is billed
+    while Textract runs.
+    """
+    request_id = context.aws_request_id
+    contract_id = event.get('contract_id')
+    s3_key = event.get('s3_key')
+    created_at = event.get('created_at')
+    content_type = event.get('content_type')
+    etag = event.get('etag')
+    user_id = get_document_owner(s3_key)
+    
+    try:
         log_with_context(
             logger, 'info',
-            f"Text extraction completed successfully. Pages: {page_count}, Confidence: {confidence}",
+            "Starting asynchronous text extraction",
             contract_id=contract_id,
             request_id=request_id
         )
         
-        return {
-            'contract_id': contract_id,
-            'extracted_text': extracted_text,
-            'page_count': page_count,
-            'extraction_confidence': confidence,
-            'status': 'text_extracted'
-        }
+        # Resume the execution right away when the document was already extracted
+        cached_result = check_and_reuse_extraction(contract_id, created_at, content_type, user_id, etag, request_id)
+        if cached_result:
+            get_client('stepfunctions').send_task_success(taskToken=event['task_token'], output=json.dumps(cached_result))
+            return
+        
+        try:
+            job_id = start_text_detection(
+                s3_key,
+                NotificationChannel={
+                    'SNSTopicArn': TEXTRACT_SNS_TOPIC_ARN,
+                    'RoleArn': TEXTRACT_SNS_ROLE_ARN
+                },
+                JobTag=contract_id
+            )
+        except Exception as e:
+            raise TextExtractionError(f"Failed to start text extraction: {str(e)}")
+        
+        try:
+            table.put_item(Item={
+                'contract_id': build_textract_job_key(job_id),
+                'job_contract_id': contract_id,
+                'created_at': created_at,
+                'user_id': user_id,
+                'etag': etag,
+                'text_key': build_extracted_text_key(contract_id, user_id, etag),
+                'task_token': event['task_token'],
+                'expires_at': int(time.time()) + TEXTRACT_JOB_TTL
+            })
+        except Exception as e:
+            logger.error(
+                f"Failed to store Textract job: {str(e)}",
+                extra={'contract_id': contract_id, 'request_id': request_id}
+            )
+            raise DatabaseError("Failed to store Textract job")
         
     except Exception as e:
         logger.error(
             f"Text extraction failed: {str(e)}",
             extra={'contract_id': contract_id, 'request_id': request_id}
         )
+        mark_extraction_failed(contract_id, created_at)
+        raise e
+
+def finish_async_extraction(event: Dict[str, Any], context: Any) -> None:
+    """Collect the results of completed Textract jobs and resume their executions"""
+    request_id = context.aws_request_id
+    
+    for record in event['Records']:
+        message = json.loads(record['Sns']['Message'])
+        job_id = message['JobId']
+        
+        # SNS can deliver a notification more than once, so claim the job by
+        # deleting it and leave duplicates to whichever delivery got there first
+        job = table.delete_item(
+            Key={'contract_id': build_textract_job_key(job_id)},
+            ReturnValues='ALL_OLD'
+        ).get('Attributes')
+        if not job:
+            logger.warning(f"Ignoring notification for unknown or already handled Textract job {job_id}")
+            continue
+        
+        contract_id = job['job_contract_id']
+        created_at = job.get('created_at')
         
-        # Update status to failed
         try:
-            update_contract_status(contract_id, 'text_extraction_failed')
-        except:
-            pass  # Don't fail if status update fails
+            if message['Status'] != 'SUCCEEDED':
+                raise TextExtractionError(f"Textract job {job_id} finished with status {message['Status']}")
+            
+            try:
+                text_key = job['text_key']
+                page_count, confidence = collect_text_detection(job_id, text_key)
+            except Exception as e:
+                raise TextExtractionError(f"Asynchronous text extraction failed: {str(e)}")
+            
+            result = store_new_extraction(
+                contract_id, created_at, job.get('user_id'), job.get('etag'), text_key,
+                page_count, confidence, request_id
+            )
+            
+        except Exception as e:
+            logger.error(
+                f"Text extraction failed: {str(e)}",
+                extra={'contract_id': contract_id, 'request_id': request_id}
+            )
+            mark_extraction_failed(contract_id, created_at)
+            resume_execution(
+                'send_task_failure', contract_id, request_id,
+                taskToken=job['task_token'],
+                error=getattr(e, 'error_code', e.__class__.__name__),
+                cause=str(e)
+            )
+            continue
         
-        raise e
+        resume_execution(
+            'send_task_success', contract_id, request_id,
+            taskToken=job['task_token'], output=json.dumps(result)
+        )
+
+def resume_execution(operation: str, contract_id: str, request_id: str, **kwargs: Any) -> None:
+    """Report a task result to Step Functions, ignoring tasks that already ended"""
+    stepfunctions_client = get_client('stepfunctions')
+    try:
+        getattr(stepfunctions_client, operation)(**kwargs)
+    except (stepfunctions_client.exceptions.TaskTimedOut,
+            stepfunctions_client.exceptions.TaskDoesNotExist,
+            stepfunctions_client.exceptions.InvalidToken) as e:
+        # The execution has already moved on, so there is nothing left to resume
+        logger.warning(
+            f"Could not resume execution: {str(e)}",
+            extra={'contract_id': contract_id, 'request_id': request_id}
+        )
+
+def check_and_reuse_extraction(contract_id: str, created_at: Optional[str], content_type: Optional[str],
+                               user_id: Optional[str], etag: Optional[str], request_id: str) -> Optional[Dict[str, Any]]:
+    """Reject unreadable documents and record a cached extraction when there is one.
+
+    Returns the Step Functions result when the cached extraction was used,
+    or None when the document still has to go through Textract.
+    """
+    # Don't spend a Textract call on a format it can't read
+    if content_type in UNSUPPORTED_CONTENT_TYPES:
+        raise TextExtractionError(f"Unsupported content type for text extraction: {content_type}")
+    
+    cached = get_cached_extraction(user_id, etag)
+    if not cached:
+        return None
+    
+    logger.info("Using cached text extraction", extra={'contract_id': contract_id, 'request_id': request_id})
+    return store_extraction_results(
+        contract_id, created_at, cached['extracted_text_key'],
+        cached['page_count'], cached['extraction_confidence'], request_id
+    )
+
+def get_document_owner(s3_key: Optional[str]) -> Optional[str]:
+    """Get the user ID from a contracts/{user_id}/{contract_id}/{filename} key"""
+    parts = (s3_key or '').split('/')
+    return parts[1] if len(parts) > 3 else None
+
+def build_extracted_text_key(contract_id: str, user_id: Optional[str], etag: Optional[str]) -> str:
+    """Build the S3 key of a document's gzipped extracted text.
+
+    Text is stored per user and ETag when both are known, so an object a cached
+    extraction points at only ever holds the text of that content, and is never
+    shared between users.
+    """
+    if user_id and etag:
+        return f"extracted/{user_id}/{etag}.txt.gz"
+    return f"extracted/{contract_id}.txt.gz"
+
+def build_textract_job_key(job_id: str) -> str:
+    """Build the item key that maps a Textract job to its contract"""
+    return f"textract-job#{job_id}"
+
+def store_new_extraction(contract_id: str, created_at: Optional[str], user_id: Optional[str], etag: Optional[str],
+                         text_key: str, page_count: int, confidence: float, request_id: str) -> Dict[str, Any]:
+    """Record a fresh extraction on the contract while caching it in parallel"""
+    cache_write = cache_writer.submit(store_cached_extraction, user_id, etag, text_key, page_count, confidence)
+    try:
+        return store_extraction_results(
+            contract_id, created_at, text_key, page_count, confidence, request_id
+        )
+    finally:
+        # Lambda freezes background threads once the handler returns
+        wait([cache_write], timeout=5)
+
+def build_extraction_cache_key(user_id: str, etag: str) -> str:
+    """Build the cache item key for a user's document extraction"""
+    return f"cache#textract#{user_id}#{etag}"
+
+def get_cached_extraction(user_id: Optional[str], etag: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Get the extraction of a document the user already processed with the same content, if any"""
+    if not user_id or not etag:
+        return None
+    
+    cache_key = build_extraction_cache_key(user_id, etag)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    try:
+        response = table.get_item(
+            Key={'contract_id': cache_key},
+            ProjectionExpression='extracted_text_key, page_count, extraction_confidence'
+        )
+    except Exception as e:
+        logger.warning(f"Failed to read cached extraction: {str(e)}")
+        return None
+    
+    cached = response.get('Item')
+    if cached:
+        extraction_cache.set(cache_key, cached)
+    return cached
+
+def store_cached_extraction(user_id: Optional[str], etag: Optional[str], text_key: str,
+                            page_count: int, confidence: float) -> None:
+    """Store an extraction so the user's documents with the same content skip Textract"""
+    if not user_id or not etag:
+        return
+    
+    cache_key = build_extraction_cache_key(user_id, etag)
+    cached = {
+        'extracted_text_key': text_key,
+        'page_count': page_count,
+        'extraction_confidence': confidence
+    }
+    try:
+        table.put_item(Item={
+            'contract_id': cache_key,
+            **cached,
+            'expires_at': int(time.time()) + EXTRACTION_CACHE_TTL
+        })
+    except Exception as e:
+        # Don't fail the extraction if the cache write fails
+        logger.warning(f"Failed to store cached extraction: {str(e)}")
+        return
+    
+    extraction_cache.set(cache_key, cached)
+
+def upload_extracted_text(text_key: str, extracted_text: str, contract_id: str, request_id: str) -> None:
+    """Store the extracted text in S3"""
+    # The text goes to S3, which keeps large contracts under the DynamoDB item
+    # size limit and out of the Step Functions payload
+    try:
+        s3_client.put_object(
+            Bucket=DOCUMENTS_BUCKET,
+            Key=text_key,
+            Body=gzip.compress(extracted_text.encode('utf-8')),
+            ContentType=EXTRACTED_TEXT_CONTENT_TYPE,
+            ContentEncoding='gzip'
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to store extracted text: {str(e)}",
+            extra={'contract_id': contract_id, 'request_id': request_id}
+        )
+        raise TextExtractionError("Failed to store extracted text")
+
+def store_extraction_results(contract_id: str, created_at: Optional[str], text_key: str,
+                             page_count: int, confidence: float, request_id: str) -> Dict[str, Any]:
+    """Record the extraction on the contract and return the Step Functions result"""
+    # Store the text location in DynamoDB in the one write of a successful extraction
+    timestamp = generate_timestamp()
+    update_expression = RESULT_UPDATE_EXPRESSION
+    # Values are written in DynamoDB's wire format, skipping the table's serializer
+    expression_values = {
+        ':text_key': {'S': text_key},
+        ':pages': {'N': str(page_count)},
+        ':conf': {'N': f'{confidence:.4f}'},
+        ':status': {'S': 'text_extracted'},
+        ':uploaded': {'S': 'uploaded'},
+        ':timestamp': {'S': timestamp}
+    }
+    if created_at:
+        update_expression = RESULT_UPDATE_EXPRESSION_WITH_SORT_KEY
+        expression_values[':status_created_at'] = {'S': build_status_sort_key('text_extracted', created_at)}
+    
+    try:
+        table.client.update_item(
+            TableName=table.name,
+            Key={'contract_id': {'S': contract_id}},
+            UpdateExpression=update_expression,
+            ConditionExpression=RESULT_CONDITION_EXPRESSION,
+            ExpressionAttributeNames=STATUS_ATTRIBUTE_NAMES,
+            ExpressionAttributeValues=expression_values
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to update contract metadata: {str(e)}",
+            extra={'contract_id': contract_id, 'request_id': request_id}
+        )
+        raise DatabaseError("Failed to update contract metadata")
+    
+    log_with_context(
+        logger, 'info',
+        f"Text extraction completed successfully. Pages: {page_count}, Confidence: {confidence}",
+        contract_id=contract_id,
+        request_id=request_id
+    )
+    
+    return {
+        'contract_id': contract_id,
+        'extracted_text_key': text_key,
+        'page_count': page_count,
+        'extraction_confidence': confidence,
+        'created_at': created_at,
+        'status': 'text_extracted'
+    }
+
+def mark_extraction_failed(contract_id: str, created_at: Optional[str]) -> None:
+    """Record the failed extraction without masking the original error"""
+    try:
+        update_contract_status(contract_id, 'text_extraction_failed', created_at)
+    except:
+        pass  # Don't fail if status update fails
 
 def extract_text_sync(s3_key: str) -> tuple[str, int, float]:
     """Extract text using synchronous Textract processing"""
     try:
+        # Small documents are sent inline, saving Textract its own S3 read
+        s3_object = s3_client.get_object(Bucket=DOCUMENTS_BUCKET, Key=s3_key)
         response = textract_client.detect_document_text(
-            Document={
-                'S3Object': {
-                    'Bucket': DOCUMENTS_BUCKET,
-                    'Name': s3_key
-                }
-            }
+            Document={'Bytes': s3_object['Body'].read()}
         )
         
-        # Extract text from response
+        # Extract text from response, keeping a running confidence total
         text_blocks = []
-        confidence_scores = []
+        confidence_total = 0.0
+        line_count = 0
+        pages = set()
         
         for block in response['Blocks']:
+            if 'Page' in block:
+                pages.add(block['Page'])
             if block['BlockType'] == 'LINE':
                 text_blocks.append(block['Text'])
-                confidence_scores.append(block['Confidence'])
+                confidence_total += block['Confidence']
+                line_count += 1
         
         extracted_text = '\n'.join(text_blocks)
-        page_count = len(set(block.get('Page', 1) for block in response['Blocks'] if 'Page' in block))
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+        page_count = len(pages) or 1
+        avg_confidence = confidence_total / line_count if line_count else 0.0
         
         return extracted_text, page_count, avg_confidence
         
     except Exception as e:
         raise TextExtractionError(f"Synchronous text extraction failed: {str(e)}")
 
-def extract_text_async(s3_key: str) -> tuple[str, int, float]:
-    """Extract text using asynchronous Textract processing"""
+def extract_text_async(s3_key: str, text_key: str) -> tuple[int, float]:
+    """Extract text to text_key using asynchronous Textract processing, polling for completion"""
     try:
-        # Start document analysis
-        response = textract_client.start_document_text_detection(
-            DocumentLocation={
-                'S3Object': {
-                    'Bucket': DOCUMENTS_BUCKET,
-                    'Name': s3_key
-                }
-            }
-        )
-        
-        job_id = response['JobId']
+        job_id = start_text_detection(s3_key)
+        wait_for_text_detection(job_id)
+        return collect_text_detection(job_id, text_key)
         
-        # Poll for completion
-        import time
-        max_attempts = 60  # 5 minutes max
-        attempt = 0
+    except Exception as e:
+        raise TextExtractionError(f"Asynchronous text extraction failed: {str(e)}")
+
+def start_text_detection(s3_key: str, **kwargs: Any) -> str:
+    """Start an asynchronous Textract job and return its ID"""
+    response = textract_client.start_document_text_detection(
+        DocumentLocation={
+            'S3Object': {
+                'Bucket': DOCUMENTS_BUCKET,
+                'Name': s3_key
+            }
+        },
+        **kwargs
+    )
+    return response['JobId']
+
+def wait_for_text_detection(job_id: str) -> None:
+    """Poll an asynchronous Textract job until it succeeds"""
+    # Poll for completion, checking small jobs early and backing off for long ones
+    deadline = time.monotonic() + POLL_BUDGET_SECONDS
+    attempt = 0
+    
+    while True:
+        result = textract_client.get_document_text_detection(JobId=job_id)
+        status = result['JobStatus']
         
-        while attempt < max_attempts:
-            result = textract_client.get_document_text_detection(JobId=job_id)
-            status = result['JobStatus']
-            
-            if status == 'SUCCEEDED':
-                break
-            elif status == 'FAILED':
-                raise TextExtractionError("Textract job failed")
-            
-            time.sleep(5)  # Wait 5 seconds before checking again
-            attempt += 1
+        if status == 'SUCCEEDED':
+            break
+        elif status == 'FAILED':
+            raise TextExtractionError("Textract job failed")
         
-        if attempt >= max_attempts:
+        # Jitter spreads polls from concurrent extractions across the Textract TPS quota
+        delay = min(POLL_MAX_DELAY_SECONDS, POLL_INITIAL_DELAY_SECONDS * POLL_BACKOFF_RATE ** attempt)
+        delay *= random.uniform(0.8, 1.2)
+        if time.monotonic() + delay > deadline:
             raise TextExtractionError("Textract job timed out")
         
-        # Extract text from all pages
-        text_blocks = []
-        confidence_scores = []
-        next_token = None
-        
+        time.sleep(delay)
+        attempt += 1
+
+def collect_text_detection(job_id: str, text_key: str) -> tuple[int, float]:
+    """Stream the text of a completed asynchronous Textract job to S3"""
+    # Upload the text as result pages arrive instead of holding all of it in memory
+    upload = ExtractedTextUpload(text_key)
+    confidence_total = 0.0
+    line_count = 0
+    pages = set()
+    
+    try:
+        # Textract has no paginator for this operation, so follow NextToken by hand
+        request = {'JobId': job_id}
         while True:
-            if next_token:
-                result = textract_client.get_document_text_detection(
-                    JobId=job_id,
-                    NextToken=next_token
-                )
-            else:
-                result = textract_client.get_document_text_detection(JobId=job_id)
-            
+            result = textract_client.get_document_text_detection(**request)
+            lines = []
             for block in result['Blocks']:
+                # Count pages across every result page, not just the last one
+                if 'Page' in block:
+                    pages.add(block['Page'])
                 if block['BlockType'] == 'LINE':
-                    text_blocks.append(block['Text'])
-                    confidence_scores.append(block['Confidence'])
+                    lines.append(block['Text'])
+                    confidence_total += block['Confidence']
+            
+            if lines:
+                upload.write(('\n' if line_count else '') + '\n'.join(lines))
+                line_count += len(lines)
             
             next_token = result.get('NextToken')
             if not next_token:
                 break
+            request['NextToken'] = next_token
         
-        extracted_text = '\n'.join(text_blocks)
-        page_count = len(set(block.get('Page', 1) for block in result['Blocks'] if 'Page' in block))
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
-        
-        return extracted_text, page_count, avg_confidence
-        
-    except Exception as e:
-        raise TextExtractionError(f"Asynchronous text extraction failed: {str(e)}")
+        upload.complete()
+    except Exception:
+        upload.abort()
+        raise
+    
+    page_count = len(pages) or 1
+    avg_confidence = confidence_total / line_count if line_count else 0.0
+    
+    return page_count, avg_confidence
 
-def update_contract_status(contract_id: str, status: str) -> None:
-    """Update contract status in DynamoDB"""
-    try:
-        table.update_item(
-            Key={'contract_id': contract_id},
-            UpdateExpression='SET #status = :status, updated_at = :timestamp',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={
-                ':status': status,
-                ':timestamp': generate_timestamp()
-            }
+class ExtractedTextUpload:
+    """Gzip text into an S3 multipart upload, sending a part whenever enough has built up"""
+
+    def __init__(self, key: str):
+        self.key = key
+        # wbits=31 writes a gzip container, matching upload_extracted_text
+        self._compressor = zlib.compressobj(wbits=31)
+        self._buffer = bytearray()
+        self._parts: List[Dict[str, Any]] = []
+        self._upload_id = s3_client.create_multipart_upload(
+            Bucket=DOCUMENTS_BUCKET,
+            Key=key,
+            ContentType=EXTRACTED_TEXT_CONTENT_TYPE,
+            ContentEncoding='gzip'
+        )['UploadId']
+
+    def write(self, text: str) -> None:
+        self._buffer += self._compressor.compress(text.encode('utf-8'))
+        if len(self._buffer) >= MULTIPART_PART_BYTES:
+            self._upload_part()
+
+    def complete(self) -> None:
+        # The gzip trailer always leaves something for the last part
+        self._buffer += self._compressor.flush()
+        self._upload_part()
+        s3_client.complete_multipart_upload(
+            Bucket=DOCUMENTS_BUCKET,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={'Parts': self._parts}
         )
-    except Exception as e:
-        logger.warning(f"Failed to update contract status: {str(e)}")
-        # Don't raise exception for status update failures
\ No newline at end of file
+
+    def abort(self) -> None:
+        try:
+            s3_client.abort_multipart_upload(Bucket=DOCUMENTS_BUCKET, Key=self.key, UploadId=self._upload_id)
+        except Exception as e:
+            # The bucket lifecycle rule cleans up uploads left behind
+            logger.warning(f"Failed to abort extracted text upload: {str(e)}")
+
+    def _upload_part(self) -> None:
+        part_number = len(self._parts) + 1
+        response = s3_client.upload_part(
+            Bucket=DOCUMENTS_BUCKET,
+            Key=self.key,
+            PartNumber=part_number,
+            UploadId=self._upload_id,
+            Body=bytes(self._buffer)
+        )
+        self._parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+        self._buffer.clear()
+
+def update_contract_status(contract_id: str, status: str, created_at: Optional[str] = None) -> None:
+    """Update contract status in DynamoDB"""
+    update_expression = STATUS_UPDATE_EXPRESSION
+    expression_values = {
+        ':status': status,
+        ':timestamp': generate_timestamp()
+    }
+    
+    # Keep the status GSI sort key in step with the status
+    if created_at:
+        update_expression = STATUS_UPDATE_EXPRESSION_WITH_SORT_KEY
+        expression_values[':status_created_at'] = build_status_sort_key(status, created_at)
+    
+    # Callers record failures with this, so errors are left to mark_extraction_failed
+    table.update_item(
+        Key={'contract_id': contract_id},
+        UpdateExpression=update_expression,
+        ExpressionAttributeNames=STATUS_ATTRIBUTE_NAMES,
+        ExpressionAttributeValues=expression_values
+    )
\ No newline at end of file
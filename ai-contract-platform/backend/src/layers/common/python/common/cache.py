@@ -0,0 +1,26 @@
+"""Per-container caching helpers"""
+import threading
+from typing import Any, Hashable, Optional
+from cachetools import TTLCache
+
+class ContainerCache:
+    """Thread-safe TTL'd LRU cache that lives as long as the Lambda container"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Get a cached value, or the default if missing or expired"""
+        with self._lock:
+            return self._cache.get(key, default)
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache a value"""
+        with self._lock:
+            self._cache[key] = value
+    
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove and return a cached value"""
+        with self._lock:
+            return self._cache.pop(key, default)
\ No newline at end of file
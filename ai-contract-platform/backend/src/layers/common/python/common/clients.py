@@ -0,0 +1,104 @@
+"""Shared AWS clients, created once per Lambda container"""
+import asyncio
+import os
+from contextlib import AsyncExitStack
+from functools import lru_cache, partial
+from typing import Any, Dict
+
+import boto3
+from botocore.config import Config
+from common.dynamodb import Table
+
+# Keep TLS connections alive between warm invocations, allow a larger
+# connection pool and retry adaptively on throttling
+CLIENT_CONFIG_OPTIONS: Dict[str, Any] = {
+    'tcp_keepalive': True,
+    'max_pool_connections': 50,
+    'retries': {'mode': 'adaptive', 'max_attempts': 3},
+    'connect_timeout': 1,
+    'read_timeout': 30
+}
+
+# Model invocations routinely take longer than the default read timeout
+READ_TIMEOUT_OVERRIDES: Dict[str, int] = {
+    'bedrock-runtime': 300
+}
+
+def get_config_options(service_name: str) -> Dict[str, Any]:
+    """Get the client configuration options for a service"""
+    options = dict(CLIENT_CONFIG_OPTIONS)
+    if service_name in READ_TIMEOUT_OVERRIDES:
+        options['read_timeout'] = READ_TIMEOUT_OVERRIDES[service_name]
+    return options
+
+@lru_cache(maxsize=None)
+def get_client(service_name: str) -> Any:
+    """Get a boto3 client shared by all invocations in this container"""
+    return boto3.client(service_name, config=Config(**get_config_options(service_name)))
+
+@lru_cache(maxsize=None)
+def get_table(table_name: str) -> Table:
+    """Get a DynamoDB table backed by the shared low-level client"""
+    return Table(table_name, partial(get_client, 'dynamodb'))
+
+@lru_cache(maxsize=None)
+def get_credentials() -> Any:
+    """Get the container's AWS credentials, refreshed by botocore as needed"""
+    return boto3.Session().get_credentials()
+
+@lru_cache(maxsize=None)
+def get_read_table(table_name: str) -> Any:
+    """Get a table for read-heavy paths, served through DAX when DAX_ENDPOINT is set.
+
+    Writes should keep using get_table to avoid the DAX write-through cost,
+    unless the written items are also read back through DAX.
+    """
+    dax_endpoint = os.environ.get('DAX_ENDPOINT')
+    if not dax_endpoint:
+        return get_table(table_name)
+    
+    # Imported here so functions that don't read through DAX don't need the client
+    import amazondax
+    
+    return Table(table_name, partial(amazondax.AmazonDaxClient, endpoint_url=dax_endpoint))
+
+class AsyncClients:
+    """aioboto3 clients kept open on a persistent event loop.
+
+    ``asyncio.run`` closes its loop after every invocation, which would also
+    close the clients' connections. Running on one loop per container lets
+    warm invocations reuse the already established connections.
+    """
+
+    def __init__(self) -> None:
+        # Imported here so functions that only use boto3 don't need aioboto3
+        import aioboto3
+        from aiobotocore.config import AioConfig
+
+        self._config_class = AioConfig
+        self._session = aioboto3.Session()
+        self._loop = asyncio.new_event_loop()
+        self._exit_stack = AsyncExitStack()
+        self._clients: Dict[str, Any] = {}
+
+    def run(self, coro: Any) -> Any:
+        """Run a coroutine on the container's event loop"""
+        return self._loop.run_until_complete(coro)
+
+    async def open(self, *service_names: str) -> None:
+        """Open any clients that are not open yet"""
+        for service_name in service_names:
+            if service_name not in self._clients:
+                config = self._config_class(**get_config_options(service_name))
+                self._clients[service_name] = await self._exit_stack.enter_async_context(
+                    self._session.client(service_name, config=config)
+                )
+
+    def client(self, service_name: str) -> Any:
+        """Get an opened client"""
+        return self._clients[service_name]
+
+@lru_cache(maxsize=None)
+def get_async_clients() -> AsyncClients:
+    """Get the aioboto3 clients shared by all invocations in this container"""
+    return AsyncClients()
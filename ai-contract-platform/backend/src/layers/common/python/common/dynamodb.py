@@ -0,0 +1,108 @@
+"""DynamoDB table access over the low-level client"""
+from decimal import Decimal
+from typing import Any, Callable, Dict
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+# Request parameters holding a whole key or item
+_ITEM_PARAMETERS = ('Key', 'Item', 'ExclusiveStartKey', 'ExpressionAttributeValues')
+
+def _to_decimal(value: Any) -> Any:
+    """Convert floats, which DynamoDB can't store, to Decimal"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {key: _to_decimal(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_decimal(item) for item in value]
+    return value
+
+def _from_decimal(value: Any) -> Any:
+    """Convert the Decimals DynamoDB returns back to int or float"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {key: _from_decimal(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_decimal(item) for item in value]
+    return value
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Python dict to DynamoDB attribute values"""
+    return {key: _serializer.serialize(_to_decimal(value)) for key, value in item.items()}
+
+def deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert DynamoDB attribute values to a Python dict"""
+    return {key: _from_decimal(_deserializer.deserialize(value)) for key, value in item.items()}
+
+class Table:
+    """The parts of the boto3 Table resource the handlers use, over a low-level client.
+
+    The resource layer loads its own service model and builds classes at
+    runtime, which adds to cold starts. The client is only created on first
+    use, and numbers are returned as int or float rather than Decimal.
+    """
+
+    def __init__(self, table_name: str, client_factory: Callable[[], Any]):
+        self.name = table_name
+        self._client_factory = client_factory
+        self._client = None
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def get_item(self, **kwargs: Any) -> Dict[str, Any]:
+        response = self.client.get_item(**self._build_request(kwargs))
+        if 'Item' in response:
+            response['Item'] = deserialize_item(response['Item'])
+        return response
+
+    def put_item(self, **kwargs: Any) -> Dict[str, Any]:
+        return self.client.put_item(**self._build_request(kwargs))
+
+    def update_item(self, **kwargs: Any) -> Dict[str, Any]:
+        response = self.client.update_item(**self._build_request(kwargs))
+        if 'Attributes' in response:
+            response['Attributes'] = deserialize_item(response['Attributes'])
+        return response
+
+    def delete_item(self, **kwargs: Any) -> Dict[str, Any]:
+        response = self.client.delete_item(**self._build_request(kwargs))
+        if 'Attributes' in response:
+            response['Attributes'] = deserialize_item(response['Attributes'])
+        return response
+
+    def query(self, **kwargs: Any) -> Dict[str, Any]:
+        response = self.client.query(**self._build_request(kwargs))
+        response['Items'] = [deserialize_item(item) for item in response.get('Items', [])]
+        if 'LastEvaluatedKey' in response:
+            response['LastEvaluatedKey'] = deserialize_item(response['LastEvaluatedKey'])
+        return response
+
+    def _build_request(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        request = dict(kwargs, TableName=self.name)
+
+        # Build key conditions written with boto3.dynamodb.conditions
+        key_condition = request.get('KeyConditionExpression')
+        if isinstance(key_condition, ConditionBase):
+            expression = ConditionExpressionBuilder().build_expression(key_condition, is_key_condition=True)
+            request['KeyConditionExpression'] = expression.condition_expression
+            request['ExpressionAttributeNames'] = {
+                **expression.attribute_name_placeholders,
+                **request.get('ExpressionAttributeNames', {})
+            }
+            request['ExpressionAttributeValues'] = {
+                **expression.attribute_value_placeholders,
+                **request.get('ExpressionAttributeValues', {})
+            }
+
+        for parameter in _ITEM_PARAMETERS:
+            if parameter in request:
+                request[parameter] = serialize_item(request[parameter])
+        return request
\ No newline at end of file
@@ -41,4 +41,9 @@ class DatabaseError(ContractPlatformError):
 class AuthorizationError(ContractPlatformError):
     """Raised when authorization fails"""
     def __init__(self, message: str):
-        super().__init__(message, "AUTHORIZATION_ERROR", 403)
\ No newline at end of file
+        super().__init__(message, "AUTHORIZATION_ERROR", 403)
+
+class ServiceUnavailableError(ContractPlatformError):
+    """Raised when a dependency is throttling and the request can be retried"""
+    def __init__(self, message: str):
+        super().__init__(message, "SERVICE_UNAVAILABLE", 503)
\ No newline at end of file
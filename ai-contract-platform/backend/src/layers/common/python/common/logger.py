@@ -1,14 +1,20 @@
 import logging
-import json
 import os
+import sys
+import orjson
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+# Context fields that handlers pass directly through ``extra``
+CONTEXT_FIELDS = ('contract_id', 'user_id', 'request_id')
+
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            'timestamp': self.formatTime(record, self.datefmt),
+            # ISO 8601 UTC from the record's creation time, like generate_timestamp
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds')[:-6] + 'Z',
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -18,25 +24,30 @@ class JSONFormatter(logging.Formatter):
         }
         
         # Add extra fields if they exist
-        if hasattr(record, 'contract_id'):
-            log_data['contract_id'] = record.contract_id
-        if hasattr(record, 'user_id'):
-            log_data['user_id'] = record.user_id
-        if hasattr(record, 'request_id'):
-            log_data['request_id'] = record.request_id
-            
-        return json.dumps(log_data)
+        fields = record.__dict__
+        for field in CONTEXT_FIELDS:
+            if field in fields:
+                log_data[field] = fields[field]
+        if 'context' in fields:
+            log_data.update(fields['context'])
+        
+        # Values that aren't JSON types, such as Decimals, are logged as strings
+        return orjson.dumps(log_data, default=str).decode('utf-8')
 
 def get_logger(name: str) -> logging.Logger:
     """Get a configured logger instance"""
     logger = logging.getLogger(name)
     
     if not logger.handlers:
-        handler = logging.StreamHandler()
+        # Lambda ships stdout to CloudWatch, which parses JSON lines natively
+        handler = logging.StreamHandler(sys.stdout)
         formatter = JSONFormatter()
         handler.setFormatter(formatter)
         logger.addHandler(handler)
         
+        # Don't also emit every record through the Lambda runtime's root handler
+        logger.propagate = False
+        
         # Set log level from environment
         log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
         logger.setLevel(getattr(logging, log_level))
@@ -49,15 +60,26 @@ def log_with_context(logger: logging.Logger, level: str, message: str,
                     request_id: Optional[str] = None,
                     **kwargs) -> None:
     """Log with additional context"""
-    extra = {}
+    level_number = logging.getLevelName(level.upper())
+    
+    # Skip building the context for records that would be dropped anyway
+    if not logger.isEnabledFor(level_number):
+        return
+    
+    # Report the caller's function and line rather than this helper's
+    if not (contract_id or user_id or request_id or kwargs):
+        logger.log(level_number, message, stacklevel=2)
+        return
+    
+    context: Dict[str, Any] = {}
     if contract_id:
-        extra['contract_id'] = contract_id
+        context['contract_id'] = contract_id
     if user_id:
-        extra['user_id'] = user_id
+        context['user_id'] = user_id
     if request_id:
-        extra['request_id'] = request_id
+        context['request_id'] = request_id
     
     # Add any additional kwargs
-    extra.update(kwargs)
+    context.update(kwargs)
     
-    getattr(logger, level.lower())(message, extra=extra)
\ No newline at end of file
+    logger.log(level_number, message, extra={'context': context}, stacklevel=2)
\ No newline at end of file
@@ -1,21 +1,54 @@
-import json
+import time
 import uuid
-from datetime import datetime
 from typing import Any, Dict, Optional
+import fastjsonschema
+import orjson
 from common.exceptions import ValidationError
 
+# Maximum contract upload size (10MB)
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
+CONTRACT_METADATA_SCHEMA = {
+    'type': 'object',
+    'required': ['filename', 'file_size', 'content_type'],
+    'properties': {
+        'filename': {'type': 'string', 'minLength': 1},
+        'file_size': {'type': 'integer', 'minimum': 0, 'maximum': MAX_FILE_SIZE},
+        'content_type': {'type': 'string'}
+    }
+}
+
+# Supported contract file extensions, without the dot
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'docx', 'doc'})
+
+# Compiled once per container into a plain Python validation function
+_validate_contract_schema = fastjsonschema.compile(CONTRACT_METADATA_SCHEMA)
+
 def generate_contract_id() -> str:
     """Generate a unique contract ID"""
     return str(uuid.uuid4())
 
 def generate_timestamp() -> str:
     """Generate ISO format timestamp"""
-    return datetime.utcnow().isoformat() + 'Z'
+    # Formatted by hand from the clock rather than through a datetime object. The
+    # fraction is always present, so timestamps sort correctly as strings.
+    now = time.time()
+    seconds = int(now)
+    microseconds = int((now - seconds) * 1e6)
+    utc = time.gmtime(seconds)
+    return (
+        f"{utc.tm_year:04d}-{utc.tm_mon:02d}-{utc.tm_mday:02d}T"
+        f"{utc.tm_hour:02d}:{utc.tm_min:02d}:{utc.tm_sec:02d}.{microseconds:06d}Z"
+    )
+
+def build_status_sort_key(status: str, created_at: str) -> str:
+    """Build the status_created_at sort key used by the user-id-status-created-at-index GSI"""
+    return f"{status}#{created_at}"
 
 def validate_file_type(filename: str) -> bool:
     """Validate if file type is supported"""
-    allowed_extensions = {'.pdf', '.docx', '.doc'}
-    return any(filename.lower().endswith(ext) for ext in allowed_extensions)
+    _, dot, extension = filename.rpartition('.')
+    return bool(dot) and extension.lower() in ALLOWED_EXTENSIONS
 
 def create_api_response(status_code: int, body: Dict[str, Any], 
                        headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
@@ -33,7 +66,7 @@ def create_api_response(status_code: int, body: Dict[str, Any],
     return {
         'statusCode': status_code,
         'headers': default_headers,
-        'body': json.dumps(body)
+        'body': orjson.dumps(body).decode('utf-8')
     }
 
 def create_error_response(error: Exception, request_id: str = None) -> Dict[str, Any]:
@@ -70,15 +103,15 @@ def extract_user_id_from_event(event: Dict[str, Any]) -> Optional[str]:
 
 def validate_contract_metadata(metadata: Dict[str, Any]) -> None:
     """Validate contract metadata"""
-    required_fields = ['filename', 'file_size', 'content_type']
-    
-    for field in required_fields:
-        if field not in metadata:
-            raise ValidationError(f"Missing required field: {field}")
+    try:
+        _validate_contract_schema(metadata)
+    except fastjsonschema.JsonSchemaValueException as e:
+        if e.rule == 'required':
+            missing_field = next(field for field in e.rule_definition if field not in metadata)
+            raise ValidationError(f"Missing required field: {missing_field}")
+        if e.rule == 'maximum':
+            raise ValidationError("File size exceeds maximum limit of 10MB")
+        raise ValidationError(f"Invalid contract metadata: {e.message}")
     
     if not validate_file_type(metadata['filename']):
-        raise ValidationError("Unsupported file type")
-    
-    # Validate file size (max 10MB)
-    if metadata['file_size'] > 10 * 1024 * 1024:
-        raise ValidationError("File size exceeds maximum limit of 10MB")
\ No newline at end of file
+        raise ValidationError("Unsupported file type")
\ No newline at end of file
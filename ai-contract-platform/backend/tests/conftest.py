@@ -0,0 +1,29 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Handlers read these at import time
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('DOCUMENTS_BUCKET', 'documents-bucket')
+os.environ.setdefault('METADATA_TABLE', 'contract-metadata')
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src', 'layers', 'common', 'python'))
+
+def load_handler(function_name: str):
+    """Import a function's handler module under a name unique to the function"""
+    module_name = f'{function_name}_handler'
+    if module_name not in sys.modules:
+        path = os.path.join(BACKEND_DIR, 'src', 'functions', function_name, 'handler.py')
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+@pytest.fixture
+def text_extraction():
+    return load_handler('text_extraction')
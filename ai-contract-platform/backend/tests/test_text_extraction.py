@@ -0,0 +1,95 @@
+import base64
+import gzip
+import os
+
+import pytest
+from botocore.stub import ANY, Stubber
+
+TEXT_KEY = 'extracted/user-1/etag-1.txt.gz'
+
+def line(text, confidence, page=1):
+    return {'BlockType': 'LINE', 'Text': text, 'Confidence': confidence, 'Page': page}
+
+@pytest.fixture
+def stubs(text_extraction):
+    """Stub the Textract and S3 clients, capturing the uploaded part bodies"""
+    textract = Stubber(text_extraction.textract_client)
+    s3 = Stubber(text_extraction.s3_client)
+    bodies = []
+
+    def capture_body(params, **kwargs):
+        bodies.append(params['Body'])
+
+    text_extraction.s3_client.meta.events.register('before-parameter-build.s3.UploadPart', capture_body)
+    with textract, s3:
+        yield textract, s3, bodies
+    text_extraction.s3_client.meta.events.unregister('before-parameter-build.s3.UploadPart', capture_body)
+    textract.assert_no_pending_responses()
+    s3.assert_no_pending_responses()
+
+def expect_multipart_upload(s3, part_count):
+    s3.add_response(
+        'create_multipart_upload',
+        {'UploadId': 'upload-1'},
+        {'Bucket': 'documents-bucket', 'Key': TEXT_KEY, 'ContentType': ANY, 'ContentEncoding': 'gzip'}
+    )
+    for part_number in range(1, part_count + 1):
+        s3.add_response(
+            'upload_part',
+            {'ETag': f'"part-{part_number}"'},
+            {'Bucket': 'documents-bucket', 'Key': TEXT_KEY, 'PartNumber': part_number,
+             'UploadId': 'upload-1', 'Body': ANY}
+        )
+    s3.add_response(
+        'complete_multipart_upload',
+        {},
+        {'Bucket': 'documents-bucket', 'Key': TEXT_KEY, 'UploadId': 'upload-1', 'MultipartUpload': {
+            'Parts': [{'ETag': f'"part-{n}"', 'PartNumber': n} for n in range(1, part_count + 1)]
+        }}
+    )
+
+def test_collect_text_detection_follows_next_token(text_extraction, stubs):
+    textract, s3, bodies = stubs
+    textract.add_response(
+        'get_document_text_detection',
+        {'JobStatus': 'SUCCEEDED', 'NextToken': 'page-2',
+         'Blocks': [{'BlockType': 'PAGE', 'Page': 1}, line('first', 90.0), line('second', 80.0)]},
+        {'JobId': 'job-1'}
+    )
+    textract.add_response(
+        'get_document_text_detection',
+        {'JobStatus': 'SUCCEEDED', 'Blocks': [{'BlockType': 'PAGE', 'Page': 2}, line('third', 70.0, page=2)]},
+        {'JobId': 'job-1', 'NextToken': 'page-2'}
+    )
+    expect_multipart_upload(s3, part_count=1)
+
+    page_count, confidence = text_extraction.collect_text_detection('job-1', TEXT_KEY)
+
+    assert page_count == 2
+    assert confidence == pytest.approx(80.0)
+    assert gzip.decompress(b''.join(bodies)).decode('utf-8') == 'first\nsecond\nthird'
+
+def test_collect_text_detection_uploads_numbered_parts(text_extraction, stubs):
+    textract, s3, bodies = stubs
+    # Base64 of random bytes barely compresses, so each result page adds about
+    # 3MB of gzip output and the second page fills the first 5MB part
+    pages = []
+    for page in range(1, 4):
+        encoded = base64.b64encode(os.urandom(3 * 1024 * 1024)).decode('ascii')
+        pages.append([line(encoded[i:i + 4096], 99.0, page) for i in range(0, len(encoded), 4096)])
+    for page, blocks in enumerate(pages, start=1):
+        response = {'JobStatus': 'SUCCEEDED', 'Blocks': blocks}
+        request = {'JobId': 'job-1'}
+        if page < len(pages):
+            response['NextToken'] = f'page-{page + 1}'
+        if page > 1:
+            request['NextToken'] = f'page-{page}'
+        textract.add_response('get_document_text_detection', response, request)
+    expect_multipart_upload(s3, part_count=2)
+
+    page_count, _ = text_extraction.collect_text_detection('job-1', TEXT_KEY)
+
+    assert page_count == 3
+    assert len(bodies[0]) >= text_extraction.MULTIPART_PART_BYTES
+    expected_text = '\n'.join(block['Text'] for blocks in pages for block in blocks)
+    assert gzip.decompress(b''.join(bodies)).decode('ascii') == expected_text